@@ -1,9 +1,12 @@
+import functools
+import json
 import os
 import time
 import shutil
 import tarfile
 from pathlib import Path
-from typing import Any, Optional
+from itertools import chain
+from typing import Any, Optional, Sequence, Type
 
 import requests
 from huggingface_hub import snapshot_download
@@ -15,8 +18,29 @@ from huggingface_hub.utils import (
 from loguru import logger
 from tqdm import tqdm
 
+# large chunks keep the python-level loop short for models of hundreds of MB
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# shared between downloads to reuse connections to the same host
+_session = requests.Session()
+
+# written into a HuggingFace snapshot once it has been downloaded with a given set of patterns
+SNAPSHOT_MANIFEST_DIR = ".fastembed_snapshots"
+
 
 class ModelManagement:
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Optional[str] = None,
+        threads: Optional[int] = None,
+        **kwargs,
+    ):
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.threads = threads
+        self._local_files_only = kwargs.pop("local_files_only", False)
+
     @classmethod
     def list_supported_models(cls) -> list[dict[str, Any]]:
         """Lists the supported models.
@@ -26,6 +50,56 @@ class ModelManagement:
         """
         raise NotImplementedError()
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _model_description_index(cls) -> dict[str, dict[str, Any]]:
+        """Maps casefolded model names to their descriptions, built once per class."""
+        index: dict[str, dict[str, Any]] = {}
+        for model in cls.list_supported_models():
+            index.setdefault(model["model"].casefold(), model)
+        return index
+
+    @classmethod
+    def _model_registry(cls) -> Sequence[Type["ModelManagement"]]:
+        """The model classes a wrapper class like `TextEmbedding` dispatches to."""
+        return cls.EMBEDDINGS_REGISTRY
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _supported_models(cls) -> tuple[dict[str, Any], ...]:
+        """Descriptions of all the models in the registry, built once per class."""
+        return tuple(
+            chain.from_iterable(model.list_supported_models() for model in cls._model_registry())
+        )
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _model_index(cls) -> dict[str, Type["ModelManagement"]]:
+        """Maps casefolded model names to the registry class implementing them."""
+        index: dict[str, Type["ModelManagement"]] = {}
+        for model_type in cls._model_registry():
+            for model in model_type.list_supported_models():
+                index.setdefault(model["model"].casefold(), model_type)
+        return index
+
+    @classmethod
+    def clear_model_cache(cls) -> None:
+        """Drops the cached model lists and lookups, e.g. after the registry has been extended."""
+        cls._supported_models.cache_clear()
+        cls._model_index.cache_clear()
+        cls._model_description_index.cache_clear()
+
+    @classmethod
+    def _resolve_model_type(cls, model_name: str) -> Optional[Type["ModelManagement"]]:
+        """Finds the registry class implementing `model_name`, returns None if there is none."""
+        model_key = model_name.casefold()
+        model_type = cls._model_index().get(model_key)
+        if model_type is None:
+            # the registry might have been extended after the index was built
+            cls.clear_model_cache()
+            model_type = cls._model_index().get(model_key)
+        return model_type
+
     @classmethod
     def _get_model_description(cls, model_name: str) -> dict[str, Any]:
         """
@@ -40,8 +114,14 @@ class ModelManagement:
         Returns:
             dict[str, Any]: The model description.
         """
+        model_key = model_name.casefold()
+        model = cls._model_description_index().get(model_key)
+        if model is not None:
+            return model
+
+        # the supported models might have been extended after the index was built
         for model in cls.list_supported_models():
-            if model_name.lower() == model["model"].lower():
+            if model_key == model["model"].casefold():
                 return model
 
         raise ValueError(f"Model {model_name} is not supported in {cls.__name__}.")
@@ -62,7 +142,7 @@ class ModelManagement:
 
         if os.path.exists(output_path):
             return output_path
-        response = requests.get(url, stream=True)
+        response = _session.get(url, stream=True)
 
         # Handle HTTP errors
         if response.status_code == 403:
@@ -87,7 +167,7 @@ class ModelManagement:
             disable=not show_progress,
         ) as progress_bar:
             with open(output_path, "wb") as file:
-                for chunk in response.iter_content(chunk_size=1024):
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                     if chunk:  # Filter out keep-alive new chunks
                         progress_bar.update(len(chunk))
                         file.write(chunk)
@@ -123,19 +203,90 @@ class ModelManagement:
         if extra_patterns is not None:
             allow_patterns.extend(extra_patterns)
 
-        snapshot_dir = Path(cache_dir) / f"models--{hf_source_repo.replace('/', '--')}"
+        repo_dir_name = f"models--{hf_source_repo.replace('/', '--')}"
+        snapshot_dir = Path(cache_dir) / repo_dir_name
+        # the snapshot directories are owned by huggingface_hub, the manifest is kept separately
+        manifest_path = Path(cache_dir) / SNAPSHOT_MANIFEST_DIR / f"{repo_dir_name}.json"
         is_cached = snapshot_dir.exists()
 
         if is_cached:
+            # a complete snapshot of the default revision doesn't need a round trip to the hub
+            if kwargs.get("revision") is None:
+                local_snapshot = cls._find_local_snapshot(
+                    snapshot_dir, manifest_path, allow_patterns
+                )
+                if local_snapshot is not None:
+                    return str(local_snapshot)
             disable_progress_bars()
 
-        return snapshot_download(
+        model_dir = snapshot_download(
             repo_id=hf_source_repo,
             allow_patterns=allow_patterns,
             cache_dir=cache_dir,
             local_files_only=local_files_only,
             **kwargs,
         )
+        if not local_files_only and kwargs.get("revision") is None:
+            # only a download checked against the hub tells which of the patterns the repo has
+            cls._write_snapshot_manifest(manifest_path, Path(model_dir), allow_patterns)
+        return model_dir
+
+    @staticmethod
+    def _write_snapshot_manifest(
+        manifest_path: Path, snapshot_path: Path, allow_patterns: list[str]
+    ) -> None:
+        """
+        Records which of the allowed files a downloaded snapshot contains.
+
+        Not every repo has all the allowed files, e.g. image models have no `tokenizer.json`,
+        the manifest tells `_find_local_snapshot` which of them have to be present. The manifest
+        is bound to the revision of the snapshot, it doesn't apply once `refs/main` moves on.
+        """
+        manifest = {
+            "revision": snapshot_path.name,
+            "allow_patterns": sorted(set(allow_patterns)),
+            "files": sorted(
+                pattern for pattern in set(allow_patterns) if (snapshot_path / pattern).exists()
+            ),
+        }
+        try:
+            manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            manifest_path.write_text(json.dumps(manifest))
+        except OSError as e:
+            logger.warning(f"Could not write snapshot manifest to {manifest_path}: {e}")
+
+    @staticmethod
+    def _find_local_snapshot(
+        repo_cache_dir: Path, manifest_path: Path, allow_patterns: list[str]
+    ) -> Optional[Path]:
+        """
+        Finds the cached snapshot of the main revision of a HuggingFace Hub repo.
+
+        Args:
+            repo_cache_dir (Path): The cache directory of the repo, e.g. `models--qdrant--all-MiniLM-L6-v2-onnx`.
+            manifest_path (Path): The manifest written by `_write_snapshot_manifest` for the repo.
+            allow_patterns (list[str]): The patterns the snapshot has to have been downloaded with.
+
+        Returns:
+            Optional[Path]: The snapshot directory, or None if there is no complete snapshot.
+        """
+        ref_path = repo_cache_dir / "refs" / "main"
+        if not ref_path.is_file():
+            return None
+        revision = ref_path.read_text().strip()
+        try:
+            manifest = json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if manifest.get("revision") != revision:
+            return None
+        if not set(allow_patterns).issubset(manifest.get("allow_patterns", ())):
+            return None
+        snapshot_path = repo_cache_dir / "snapshots" / revision
+        # snapshot files are symlinks to blobs, `exists` also checks that the blob is in place
+        if all((snapshot_path / file).exists() for file in manifest.get("files", ())):
+            return snapshot_path
+        return None
 
     @classmethod
     def decompress_to_cache(cls, targz_path: str, cache_dir: str):
@@ -158,12 +309,15 @@ class ModelManagement:
             raise ValueError(f"{targz_path} is not a .tar.gz file.")
 
         try:
-            # Open the tar.gz file
-            with tarfile.open(targz_path, "r:gz") as tar:
+            # Open the tar.gz file as a stream, members are extracted sequentially anyway
+            with tarfile.open(targz_path, "r|gz") as tar:
                 # Extract all files into the cache directory
-                tar.extractall(
-                    path=cache_dir,
-                )
+                if hasattr(tarfile, "data_filter"):
+                    # skips restoring ownership and unsafe members, available since python 3.12
+                    # and in security releases of older versions
+                    tar.extractall(path=cache_dir, filter="data")
+                else:
+                    tar.extractall(path=cache_dir)
         except tarfile.TarError as e:
             # If any error occurs while opening or extracting the tar.gz file,
             # delete the cache directory (if it was created in this function)
@@ -244,10 +398,15 @@ class ModelManagement:
             cache_dir (str): The path to the cache directory.
             retries: (int): The number of times to retry (including the first attempt)
 
+        Set the `FASTEMBED_OFFLINE` env variable to only use models already present in `cache_dir`.
+
         Returns:
             Path: The path to the downloaded model directory.
         """
-        local_files_only = kwargs.get("local_files_only", False)
+        local_files_only = kwargs.get("local_files_only", False) or os.getenv(
+            "FASTEMBED_OFFLINE", ""
+        ).lower() in ("1", "true", "yes", "on")
+        kwargs["local_files_only"] = local_files_only
         retries = 1 if local_files_only else retries
         hf_source = model.get("sources", {}).get("hf")
         url_source = model.get("sources", {}).get("url")
@@ -1,10 +1,16 @@
+import os
+import threading
+import time
 import warnings
-from dataclasses import dataclass
+import weakref
+from dataclasses import dataclass, fields, replace
+from multiprocessing import shared_memory
 from pathlib import Path
 from typing import Any, Generic, Iterable, Optional, Sequence, Type, TypeVar
 
 import numpy as np
 import onnxruntime as ort
+from loguru import logger
 
 from fastembed.common.types import OnnxProvider
 from fastembed.parallel_processor import Worker
@@ -20,6 +26,144 @@ class OnnxOutputContext:
     input_ids: Optional[np.ndarray] = None
 
 
+# Worker outputs at least this large are passed to the main process through shared memory
+shared_memory_min_bytes = 1 << 20
+
+# Precisions the model weights can be loaded in, int8 weights are quantized dynamically
+supported_quantizations = ("fp32", "int8")
+
+# Sessions are shared between model instances loading the same file with the same configuration,
+# a session is released once no instance refers to it anymore
+_session_cache: "weakref.WeakValueDictionary[tuple, ort.InferenceSession]" = (
+    weakref.WeakValueDictionary()
+)
+_session_cache_lock = threading.Lock()
+
+
+@dataclass
+class SharedArray:
+    """Handle of an array placed in a shared memory block, cheap to pickle."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "SharedArray":
+        shm = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        try:
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+            view[...] = array
+            del view  # the block can't be closed while a view exports its buffer
+        finally:
+            shm.close()
+        return cls(name=shm.name, shape=array.shape, dtype=array.dtype.str)
+
+    def to_array(self) -> np.ndarray:
+        """Copy the array out of shared memory and release the block."""
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            view = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+            array = view.copy()
+            del view
+        finally:
+            shm.close()
+            shm.unlink()
+        return array
+
+
+def _share_output(output: OnnxOutputContext) -> OnnxOutputContext:
+    """
+    Move large arrays of a worker output to shared memory, so that only their handles are pickled
+    through the output queue instead of the whole arrays.
+    """
+    if os.name != "posix":
+        # on windows a block is destroyed as soon as the worker closes it
+        return output
+    shared = {}
+    for field in fields(output):
+        value = getattr(output, field.name)
+        if (
+            isinstance(value, np.ndarray)
+            and value.nbytes >= shared_memory_min_bytes
+            and not value.dtype.hasobject
+        ):
+            shared[field.name] = SharedArray.from_array(value)
+    return replace(output, **shared) if shared else output
+
+
+def _restore_output(output: OnnxOutputContext) -> OnnxOutputContext:
+    """Reverse of `_share_output`, to be called in the main process."""
+    restored = {}
+    for field in fields(output):
+        value = getattr(output, field.name)
+        if isinstance(value, SharedArray):
+            restored[field.name] = value.to_array()
+    return replace(output, **restored) if restored else output
+
+
+def _session_cache_key(
+    model_path: Path, providers: list[OnnxProvider], so: ort.SessionOptions
+) -> tuple:
+    # all the properties of the options are part of the key, so that options added by later
+    # onnxruntime versions can't make differently configured instances share a session
+    options = tuple(
+        (name, repr(getattr(so, name)))
+        for name in dir(so)
+        if not name.startswith("_") and not callable(getattr(so, name))
+    )
+    return str(model_path.resolve()), repr(providers), options
+
+
+def _has_external_data(model_path: Path) -> bool:
+    """Whether the initializers of the model are stored in separate files, e.g. `model.onnx_data`."""
+    return any(
+        path.name != model_path.name and path.name.startswith(model_path.name)
+        for path in model_path.parent.iterdir()
+    )
+
+
+def _persisted_optimization_level(
+    level: ort.GraphOptimizationLevel,
+) -> ort.GraphOptimizationLevel:
+    """The optimization level a graph is persisted at, excluding hardware specific optimizations."""
+    extended = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    return extended if int(level) > int(extended) else level
+
+
+def _load_optimized_session(
+    optimized_model_path: Path, providers: list[OnnxProvider], so: ort.SessionOptions
+) -> ort.InferenceSession:
+    """
+    Load a persisted optimized graph. Optimizations it already went through are not repeated,
+    except for `ORT_ENABLE_ALL`, whose hardware specific layout optimizations are not persisted.
+    """
+    if so.graph_optimization_level != ort.GraphOptimizationLevel.ORT_ENABLE_ALL:
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+    return ort.InferenceSession(str(optimized_model_path), providers=providers, sess_options=so)
+
+
+def _acquire_lock(lock_path: Path, stale_after: float = 10 * 60) -> bool:
+    """
+    Try to create a lock file, returns False if it is held by someone else or can't be created.
+    Locks older than `stale_after` seconds are considered abandoned by a crashed process.
+    """
+    for _ in range(2):
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime < stale_after:
+                    return False
+                lock_path.unlink()
+            except OSError:
+                return False
+        except OSError:  # e.g. read-only cache directory
+            return False
+    return False
+
+
 class OnnxModel(Generic[T]):
     @classmethod
     def _get_worker_class(cls) -> Type["EmbeddingWorker"]:
@@ -48,6 +192,7 @@ class OnnxModel(Generic[T]):
         providers: Optional[Sequence[OnnxProvider]] = None,
         cuda: bool = False,
         device_id: Optional[int] = None,
+        session_options: Optional[ort.SessionOptions] = None,
     ) -> None:
         model_path = model_dir / model_file
         # List of Execution Providers: https://onnxruntime.ai/docs/execution-providers
@@ -73,19 +218,41 @@ class OnnxModel(Generic[T]):
                     f"Provider {provider_name} is not available. Available providers: {available_providers}"
                 )
 
-        so = ort.SessionOptions()
-        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if session_options is not None:
+            so = session_options
+        else:
+            so = ort.SessionOptions()
+            so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            # reuse arena allocations and the memory plan between runs instead of allocating per batch
+            so.enable_cpu_mem_arena = True
+            so.enable_mem_pattern = True
 
-        if threads is not None:
-            so.intra_op_num_threads = threads
-            so.inter_op_num_threads = threads
+            if threads is not None:
+                so.intra_op_num_threads = threads
+                so.inter_op_num_threads = threads
 
-        self.model = ort.InferenceSession(
-            str(model_path), providers=onnx_providers, sess_options=so
-        )
+        cache_key = _session_cache_key(model_path, onnx_providers, so)
+        with _session_cache_lock:
+            session = _session_cache.get(cache_key)
+        if session is None:
+            if requested_provider_names == ["CPUExecutionProvider"]:
+                session = self._create_cpu_session(model_path, onnx_providers, so)
+            else:
+                session = ort.InferenceSession(
+                    str(model_path), providers=onnx_providers, sess_options=so
+                )
+            with _session_cache_lock:
+                # another thread might have loaded the same model in the meantime
+                session = _session_cache.setdefault(cache_key, session)
+        self.model = session
+        # device the outputs are bound to, they are copied to the host once after the run
+        self._output_device = ("cpu", 0)
         if "CUDAExecutionProvider" in requested_provider_names:
             current_providers = self.model.get_providers()
-            if "CUDAExecutionProvider" not in current_providers:
+            if "CUDAExecutionProvider" in current_providers:
+                cuda_options = self.model.get_provider_options()["CUDAExecutionProvider"]
+                self._output_device = ("cuda", int(cuda_options.get("device_id", 0)))
+            else:
                 warnings.warn(
                     f"Attempt to set CUDAExecutionProvider failed. Current providers: {current_providers}."
                     "If you are using CUDA 12.x, install onnxruntime-gpu via "
@@ -93,9 +260,172 @@ class OnnxModel(Generic[T]):
                     RuntimeWarning,
                 )
 
+    @staticmethod
+    def _create_cpu_session(
+        model_path: Path, providers: list[OnnxProvider], so: ort.SessionOptions
+    ) -> ort.InferenceSession:
+        """
+        Create a CPU inference session, persisting the optimized graph on the first run.
+
+        Graph optimizations are re-applied each time a session is created, which dominates the
+        warmup of every spawned worker. The optimized graph is saved next to the original model
+        once, subsequent sessions load it instead of optimizing the original model again.
+
+        Only the portable optimizations up to `ORT_ENABLE_EXTENDED` are persisted, the layout
+        optimizations of `ORT_ENABLE_ALL` depend on the hardware and are applied on every load.
+        The file name carries the onnxruntime version, as the fused operators may change between
+        versions. A file which can't be loaded is removed and the original model is used instead.
+        """
+        if _has_external_data(model_path):
+            # initializers stored in separate files can't be serialized into a single graph
+            return ort.InferenceSession(str(model_path), providers=providers, sess_options=so)
+
+        requested_level = so.graph_optimization_level
+        persisted_level = _persisted_optimization_level(requested_level)
+        optimized_model_path = model_path.with_name(
+            f"{model_path.stem}.ort_opt.{ort.__version__}.onnx"
+        )
+        if optimized_model_path.exists():
+            try:
+                return _load_optimized_session(optimized_model_path, providers, so)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f"Could not load optimized model {optimized_model_path}: {e}")
+                optimized_model_path.unlink(missing_ok=True)
+                so.graph_optimization_level = requested_level
+
+        lock_path = optimized_model_path.with_suffix(".lock")
+        if not _acquire_lock(lock_path):
+            # the optimized model is being written by another process, don't wait for it
+            return ort.InferenceSession(str(model_path), providers=providers, sess_options=so)
+
+        # ORT writes the file while building the session, other processes must not pick it up
+        # before it is complete
+        tmp_path = model_path.with_name(f"{model_path.stem}.ort_opt.{os.getpid()}.tmp.onnx")
+        try:
+            so.graph_optimization_level = persisted_level
+            so.optimized_model_filepath = str(tmp_path)
+            try:
+                session = ort.InferenceSession(
+                    str(model_path), providers=providers, sess_options=so
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                # e.g. models exceeding the protobuf size limit can't be saved in a single file
+                logger.warning(f"Could not save optimized model to {optimized_model_path}: {e}")
+                so.optimized_model_filepath = ""
+                so.graph_optimization_level = requested_level
+                return ort.InferenceSession(str(model_path), providers=providers, sess_options=so)
+            so.optimized_model_filepath = ""
+            try:
+                os.replace(tmp_path, optimized_model_path)
+            except OSError as e:
+                logger.warning(f"Could not save optimized model to {optimized_model_path}: {e}")
+                so.graph_optimization_level = requested_level
+                return ort.InferenceSession(str(model_path), providers=providers, sess_options=so)
+            if persisted_level == requested_level:
+                return session
+            # the layout optimizations left out of the persisted graph are applied on load
+            so.graph_optimization_level = requested_level
+            return _load_optimized_session(optimized_model_path, providers, so)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+            lock_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _check_quantization(quantization: str) -> None:
+        if quantization not in supported_quantizations:
+            raise ValueError(
+                f"Quantization {quantization} is not supported, use one of: "
+                + ", ".join(f"'{name}'" for name in supported_quantizations)
+            )
+
+    @classmethod
+    def _quantized_model_file(
+        cls,
+        model_dir: Path,
+        model_file: str,
+        quantization: str,
+        providers: Optional[Sequence[OnnxProvider]] = None,
+        cuda: bool = False,
+    ) -> str:
+        """
+        Get the model file to load for `quantization`, quantizing the weights if needed.
+        int8 is only applied with the CPU execution provider, which has the int8 kernels.
+
+        Returns:
+            str: The model file, relative to `model_dir`.
+        """
+        if quantization != "int8":
+            return model_file
+        provider_names = [
+            provider if isinstance(provider, str) else provider[0] for provider in providers or ()
+        ]
+        if cuda or any(name != "CPUExecutionProvider" for name in provider_names):
+            warnings.warn(
+                "int8 quantization is only supported with CPUExecutionProvider, "
+                "the fp32 model is loaded instead.",
+                RuntimeWarning,
+            )
+            return model_file
+        return cls._quantize_model_file(model_dir, model_file)
+
+    @staticmethod
+    def _quantize_model_file(model_dir: Path, model_file: str) -> str:
+        """
+        Dynamically quantize the model weights to int8.
+        The quantized model is written once next to the original model and reused afterwards.
+
+        Returns:
+            str: The quantized model file, relative to `model_dir`.
+        """
+        # onnxruntime.quantization pulls in `onnx`, import it only when it is actually needed
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        model_path = model_dir / model_file
+        quantized_path = model_path.with_name(f"{model_path.stem}_int8.onnx")
+        lock_path = quantized_path.with_suffix(".lock")
+
+        while not quantized_path.exists():
+            if _acquire_lock(lock_path):
+                tmp_path = model_path.with_name(f"{model_path.stem}_int8.{os.getpid()}.tmp.onnx")
+                try:
+                    quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+                    os.replace(tmp_path, quantized_path)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+                    lock_path.unlink(missing_ok=True)
+            elif lock_path.exists():
+                # the model is being quantized by another process
+                time.sleep(1)
+            else:
+                raise ValueError(f"Could not write quantized model to {quantized_path}")
+
+        return str(quantized_path.relative_to(model_dir))
+
     def load_onnx_model(self) -> None:
         raise NotImplementedError("Subclasses must implement this method")
 
+    def _run_model(
+        self, onnx_input: dict[str, np.ndarray], output_names: Optional[list[str]] = None
+    ) -> list[np.ndarray]:
+        """
+        Run the session through an IOBinding.
+
+        Inputs are bound to the numpy buffers directly and outputs are written into buffers
+        allocated from the session arena, which are reused across consecutive batches.
+        With CUDA, outputs are kept on the device during the run and copied to the host once.
+        A binding is created per call, so the same session can be shared between threads.
+        """
+        io_binding = self.model.io_binding()
+        for name, value in onnx_input.items():
+            io_binding.bind_cpu_input(name, np.ascontiguousarray(value))
+        if output_names is None:
+            output_names = [node.name for node in self.model.get_outputs()]
+        device_type, device_id = self._output_device
+        for name in output_names:
+            io_binding.bind_output(name, device_type, device_id)
+        self.model.run_with_iobinding(io_binding)
+        return io_binding.copy_outputs_to_cpu()
+
     def onnx_embed(self, *args, **kwargs) -> OnnxOutputContext:
         raise NotImplementedError("Subclasses must implement this method")
 
@@ -1,14 +1,28 @@
 import json
+import os
 from pathlib import Path
+from typing import Optional
 
 from tokenizers import AddedToken, Tokenizer
 
 from fastembed.image.transform.operators import Compose
 
 
-def load_special_tokens(model_dir: Path) -> dict:
+def _list_file_names(model_dir: Path) -> set[str]:
+    # a single directory listing instead of a stat call per required file
+    try:
+        with os.scandir(model_dir) as entries:
+            return {entry.name for entry in entries}
+    except FileNotFoundError:
+        return set()
+
+
+def load_special_tokens(model_dir: Path, file_names: Optional[set[str]] = None) -> dict:
+    if file_names is None:
+        file_names = _list_file_names(model_dir)
+
     tokens_map_path = model_dir / "special_tokens_map.json"
-    if not tokens_map_path.exists():
+    if tokens_map_path.name not in file_names:
         raise ValueError(f"Could not find special_tokens_map.json in {model_dir}")
 
     with open(str(tokens_map_path)) as tokens_map_file:
@@ -18,16 +32,18 @@ def load_special_tokens(model_dir: Path) -> dict:
 
 
 def load_tokenizer(model_dir: Path) -> tuple[Tokenizer, dict]:
+    file_names = _list_file_names(model_dir)
+
     config_path = model_dir / "config.json"
-    if not config_path.exists():
+    if config_path.name not in file_names:
         raise ValueError(f"Could not find config.json in {model_dir}")
 
     tokenizer_path = model_dir / "tokenizer.json"
-    if not tokenizer_path.exists():
+    if tokenizer_path.name not in file_names:
         raise ValueError(f"Could not find tokenizer.json in {model_dir}")
 
     tokenizer_config_path = model_dir / "tokenizer_config.json"
-    if not tokenizer_config_path.exists():
+    if tokenizer_config_path.name not in file_names:
         raise ValueError(f"Could not find tokenizer_config.json in {model_dir}")
 
     with open(str(config_path)) as config_file:
@@ -45,7 +61,7 @@ def load_tokenizer(model_dir: Path) -> tuple[Tokenizer, dict]:
         else:
             max_context = min(tokenizer_config["model_max_length"], tokenizer_config["max_length"])
 
-    tokens_map = load_special_tokens(model_dir)
+    tokens_map = load_special_tokens(model_dir, file_names)
 
     tokenizer = Tokenizer.from_file(str(tokenizer_path))
     tokenizer.enable_truncation(max_length=max_context)
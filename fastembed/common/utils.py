@@ -1,3 +1,5 @@
+import functools
+import math
 import os
 import sys
 import re
@@ -5,16 +7,37 @@ import tempfile
 import unicodedata
 from pathlib import Path
 from itertools import islice
-from typing import Generator, Iterable, Optional, Union
+from typing import Any, Callable, Generator, Iterable, Optional, Sequence, Union
 
 import numpy as np
 
+_NON_ALPHANUMERIC = re.compile(r"[^\w\s]", flags=re.UNICODE)
+
+# Items are sorted by length within windows of this many batches to reduce padding
+length_sort_window_batches = 8
+
+
+def normalize(input_array, p=2, dim=1, eps=1e-12, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Lp-normalize `input_array` along `dim`.
+    `out` may be `input_array` itself to normalize in place without allocating the result.
+    """
+    if p == 2 and dim == 1 and input_array.ndim == 2 and input_array.shape[0] == 1:
+        # a single query: scalar math avoids the dispatch overhead of several numpy calls
+        row = input_array[0]
+        norm = math.sqrt(float(row.dot(row)))
+        return np.multiply(input_array, 1.0 / max(norm, eps), out=out)
+
+    if p == 2 and dim == 1 and input_array.ndim == 2:
+        # L2 over rows: a single fused multiply-add pass and one sqrt per row
+        squared_norm = np.einsum("ij,ij->i", input_array, input_array)
+        inv_norm = np.reciprocal(np.sqrt(np.maximum(squared_norm, eps * eps)))
+        return np.multiply(input_array, inv_norm[:, None], out=out)
 
-def normalize(input_array, p=2, dim=1, eps=1e-12) -> np.ndarray:
     # Calculate the Lp norm along the specified dimension
     norm = np.linalg.norm(input_array, ord=p, axis=dim, keepdims=True)
     norm = np.maximum(norm, eps)  # Avoid division by zero
-    normalized_array = input_array / norm
+    normalized_array = np.divide(input_array, norm, out=out)
     return normalized_array
 
 
@@ -24,11 +47,57 @@ def iter_batch(iterable: Union[Iterable, Generator], size: int) -> Iterable:
     [[1, 2, 3], [4, 5]]
     """
     source_iter = iter(iterable)
-    while source_iter:
+    while True:
         b = list(islice(source_iter, size))
-        if len(b) == 0:
-            break
+        if not b:
+            return
         yield b
+        # a short batch means the source is exhausted, no need to poll it once more
+        if len(b) < size:
+            return
+
+
+def iter_length_sorted_batches(
+    items: Sequence[str], size: int, window: int
+) -> Iterable[tuple[list[int], list[str]]]:
+    """
+    Group items of similar length into batches, sorting them within windows of `window` items.
+    Yields positions of the batch items in `items` along with the batch.
+
+    >>> list(iter_length_sorted_batches(["ccc", "a", "bb", "dddd", "e"], 2, 4))
+    [([1, 2], ['a', 'bb']), ([0, 3], ['ccc', 'dddd']), ([4], ['e'])]
+    """
+    for start in range(0, len(items), window):
+        order = sorted(range(start, min(start + window, len(items))), key=lambda i: len(items[i]))
+        for i in range(0, len(order), size):
+            positions = order[i : i + size]
+            yield positions, [items[position] for position in positions]
+
+
+def map_length_sorted_batches(
+    items: Sequence[str],
+    size: int,
+    process: Callable[
+        [Iterable[tuple[list[int], list[str]]]], Iterable[tuple[list[int], Iterable]]
+    ],
+) -> Iterable[Any]:
+    """
+    Process items in batches of similar length, yield one result per item in the original order.
+    `process` receives the `(positions, batch)` pairs of `iter_length_sorted_batches` and yields
+    the positions of each batch along with its results, batches may be processed ahead.
+
+    >>> list(map_length_sorted_batches(["ccc", "a", "bb"], 2, lambda batches: batches))
+    ['ccc', 'a', 'bb']
+    """
+    buffer = {}
+    next_expected = 0
+    window = size * length_sort_window_batches
+
+    for positions, results in process(iter_length_sorted_batches(items, size, window)):
+        buffer.update(zip(positions, results))
+        while next_expected in buffer:
+            yield buffer.pop(next_expected)
+            next_expected += 1
 
 
 def define_cache_dir(cache_dir: Optional[str] = None) -> Path:
@@ -45,11 +114,18 @@ def define_cache_dir(cache_dir: Optional[str] = None) -> Path:
     return cache_path
 
 
-def get_all_punctuation() -> set[str]:
-    return set(
+@functools.lru_cache(maxsize=1)
+def get_all_punctuation() -> frozenset[str]:
+    # scanning every code point takes a noticeable time, compute the set only once per process
+    return frozenset(
         chr(i) for i in range(sys.maxunicode) if unicodedata.category(chr(i)).startswith("P")
     )
 
 
 def remove_non_alphanumeric(text: str) -> str:
-    return re.sub(r"[^\w\s]", " ", text, flags=re.UNICODE)
+    return _NON_ALPHANUMERIC.sub(" ", text)
+
+
+def remove_non_alphanumeric_batch(texts: Iterable[str]) -> list[str]:
+    sub = _NON_ALPHANUMERIC.sub
+    return [sub(" ", text) for text in texts]
@@ -35,10 +35,7 @@ class ImageEmbedding(ImageEmbeddingBase):
                 ]
                 ```
         """
-        result = []
-        for embedding in cls.EMBEDDINGS_REGISTRY:
-            result.extend(embedding.list_supported_models())
-        return result
+        return list(cls._supported_models())
 
     def __init__(
         self,
@@ -52,20 +49,20 @@ class ImageEmbedding(ImageEmbeddingBase):
         **kwargs,
     ):
         super().__init__(model_name, cache_dir, threads, **kwargs)
-        for EMBEDDING_MODEL_TYPE in self.EMBEDDINGS_REGISTRY:
-            supported_models = EMBEDDING_MODEL_TYPE.list_supported_models()
-            if any(model_name.lower() == model["model"].lower() for model in supported_models):
-                self.model = EMBEDDING_MODEL_TYPE(
-                    model_name,
-                    cache_dir,
-                    threads=threads,
-                    providers=providers,
-                    cuda=cuda,
-                    device_ids=device_ids,
-                    lazy_load=lazy_load,
-                    **kwargs,
-                )
-                return
+        EMBEDDING_MODEL_TYPE = self._resolve_model_type(model_name)
+
+        if EMBEDDING_MODEL_TYPE is not None:
+            self.model = EMBEDDING_MODEL_TYPE(
+                model_name,
+                cache_dir,
+                threads=threads,
+                providers=providers,
+                cuda=cuda,
+                device_ids=device_ids,
+                lazy_load=lazy_load,
+                **kwargs,
+            )
+            return
 
         raise ValueError(
             f"Model {model_name} is not supported in ImageEmbedding."
@@ -94,4 +91,4 @@ class ImageEmbedding(ImageEmbeddingBase):
         Returns:
             List of embeddings, one per document
         """
-        yield from self.model.embed(images, batch_size, parallel, **kwargs)
+        return self.model.embed(images, batch_size, parallel, **kwargs)
@@ -7,18 +7,6 @@ from fastembed.common.types import ImageInput
 
 
 class ImageEmbeddingBase(ModelManagement):
-    def __init__(
-        self,
-        model_name: str,
-        cache_dir: Optional[str] = None,
-        threads: Optional[int] = None,
-        **kwargs,
-    ):
-        self.model_name = model_name
-        self.cache_dir = cache_dir
-        self.threads = threads
-        self._local_files_only = kwargs.pop("local_files_only", False)
-
     def embed(
         self,
         images: ImageInput,
@@ -161,7 +161,7 @@ class OnnxImageEmbedding(ImageEmbeddingBase, OnnxImageModel[np.ndarray]):
             List of embeddings, one per document
         """
 
-        yield from self._embed_images(
+        return self._embed_images(
             model_name=self.model_name,
             cache_dir=str(self.cache_dir),
             images=images,
@@ -187,7 +187,7 @@ class OnnxImageEmbedding(ImageEmbeddingBase, OnnxImageModel[np.ndarray]):
         return onnx_input
 
     def _post_process_onnx_output(self, output: OnnxOutputContext) -> Iterable[np.ndarray]:
-        return normalize(output.model_output).astype(np.float32)
+        return normalize(output.model_output).astype(np.float32, copy=False)
 
 
 class OnnxImageEmbeddingWorker(ImageEmbeddingWorker):
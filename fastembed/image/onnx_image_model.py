@@ -8,7 +8,14 @@ import numpy as np
 from PIL import Image
 
 from fastembed.common import ImageInput, OnnxProvider
-from fastembed.common.onnx_model import EmbeddingWorker, OnnxModel, OnnxOutputContext, T
+from fastembed.common.onnx_model import (
+    EmbeddingWorker,
+    OnnxModel,
+    OnnxOutputContext,
+    T,
+    _restore_output,
+    _share_output,
+)
 from fastembed.common.preprocessor_utils import load_preprocessor
 from fastembed.common.utils import iter_batch
 from fastembed.parallel_processor import ParallelWorkerPool
@@ -95,7 +102,8 @@ class OnnxImageModel(OnnxModel[T]):
         if isinstance(images, list) and len(images) < batch_size:
             is_small = True
 
-        if parallel is None or is_small:
+        # a single worker process would only add startup and transfer costs to the same work
+        if parallel is None or parallel == 1 or is_small:
             if not hasattr(self, "model") or self.model is None:
                 self.load_onnx_model()
 
@@ -121,11 +129,11 @@ class OnnxImageModel(OnnxModel[T]):
                 start_method=start_method,
             )
             for batch in pool.ordered_map(iter_batch(images, batch_size), **params):
-                yield from self._post_process_onnx_output(batch)
+                yield from self._post_process_onnx_output(_restore_output(batch))
 
 
 class ImageEmbeddingWorker(EmbeddingWorker):
     def process(self, items: Iterable[tuple[int, Any]]) -> Iterable[tuple[int, Any]]:
         for idx, batch in items:
             embeddings = self.model.onnx_embed(batch)
-            yield idx, embeddings
+            yield idx, _share_output(embeddings)
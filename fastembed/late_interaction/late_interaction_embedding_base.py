@@ -6,18 +6,6 @@ from fastembed.common.model_management import ModelManagement
 
 
 class LateInteractionTextEmbeddingBase(ModelManagement):
-    def __init__(
-        self,
-        model_name: str,
-        cache_dir: Optional[str] = None,
-        threads: Optional[int] = None,
-        **kwargs,
-    ):
-        self.model_name = model_name
-        self.cache_dir = cache_dir
-        self.threads = threads
-        self._local_files_only = kwargs.pop("local_files_only", False)
-
     def embed(
         self,
         documents: Union[str, Iterable[str]],
@@ -58,5 +46,5 @@ class LateInteractionTextEmbeddingBase(ModelManagement):
         # This is model-specific, so that different models can have specialized implementations
         if isinstance(query, str):
             yield from self.embed([query], **kwargs)
-        if isinstance(query, Iterable):
+        else:
             yield from self.embed(query, **kwargs)
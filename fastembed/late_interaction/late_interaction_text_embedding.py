@@ -38,10 +38,7 @@ class LateInteractionTextEmbedding(LateInteractionTextEmbeddingBase):
                 ]
                 ```
         """
-        result = []
-        for embedding in cls.EMBEDDINGS_REGISTRY:
-            result.extend(embedding.list_supported_models())
-        return result
+        return list(cls._supported_models())
 
     def __init__(
         self,
@@ -55,20 +52,20 @@ class LateInteractionTextEmbedding(LateInteractionTextEmbeddingBase):
         **kwargs,
     ):
         super().__init__(model_name, cache_dir, threads, **kwargs)
-        for EMBEDDING_MODEL_TYPE in self.EMBEDDINGS_REGISTRY:
-            supported_models = EMBEDDING_MODEL_TYPE.list_supported_models()
-            if any(model_name.lower() == model["model"].lower() for model in supported_models):
-                self.model = EMBEDDING_MODEL_TYPE(
-                    model_name,
-                    cache_dir,
-                    threads=threads,
-                    providers=providers,
-                    cuda=cuda,
-                    device_ids=device_ids,
-                    lazy_load=lazy_load,
-                    **kwargs,
-                )
-                return
+        EMBEDDING_MODEL_TYPE = self._resolve_model_type(model_name)
+
+        if EMBEDDING_MODEL_TYPE is not None:
+            self.model = EMBEDDING_MODEL_TYPE(
+                model_name,
+                cache_dir,
+                threads=threads,
+                providers=providers,
+                cuda=cuda,
+                device_ids=device_ids,
+                lazy_load=lazy_load,
+                **kwargs,
+            )
+            return
 
         raise ValueError(
             f"Model {model_name} is not supported in LateInteractionTextEmbedding."
@@ -97,7 +94,7 @@ class LateInteractionTextEmbedding(LateInteractionTextEmbeddingBase):
         Returns:
             List of embeddings, one per document
         """
-        yield from self.model.embed(documents, batch_size, parallel, **kwargs)
+        return self.model.embed(documents, batch_size, parallel, **kwargs)
 
     def query_embed(self, query: Union[str, Iterable[str]], **kwargs) -> Iterable[np.ndarray]:
         """
@@ -111,4 +108,4 @@ class LateInteractionTextEmbedding(LateInteractionTextEmbeddingBase):
         """
 
         # This is model-specific, so that different models can have specialized implementations
-        yield from self.model.query_embed(query, **kwargs)
+        return self.model.query_embed(query, **kwargs)
@@ -3,7 +3,7 @@ import os
 from collections import defaultdict
 from copy import deepcopy
 from enum import Enum
-from multiprocessing import Queue, get_context
+from multiprocessing import Queue, forkserver, get_context
 from multiprocessing.context import BaseContext
 from multiprocessing.process import BaseProcess
 from multiprocessing.sharedctypes import Synchronized as BaseValue
@@ -17,6 +17,23 @@ processing_timeout = 10 * 60  # seconds
 max_internal_batch_size = 200
 
 
+def _extend_forkserver_preload(ctx: BaseContext, modules: list[str]) -> None:
+    """
+    Add modules to the forkserver preload list, keeping the modules preloaded by the application.
+    The list is only changed if some of the modules are missing from it.
+    """
+    # `set_forkserver_preload` replaces the list of the process-wide fork server and there is no
+    # public getter for it. The list set by the application is read from the private attribute
+    # so that it is kept. Should the attribute ever go away, the list is left as it is rather
+    # than risking to drop the modules of the application.
+    preload = getattr(forkserver._forkserver, "_preload_modules", None)
+    if not isinstance(preload, list):
+        return
+    missing = [module for module in modules if module not in preload]
+    if missing:
+        ctx.set_forkserver_preload(preload + missing)
+
+
 class QueueSignals(str, Enum):
     stop = "stop"
     confirm = "confirm"
@@ -102,6 +119,10 @@ class ParallelWorkerPool:
         self.input_queue: Optional[Queue] = None
         self.output_queue: Optional[Queue] = None
         self.ctx: BaseContext = get_context(start_method)
+        if start_method == "forkserver" and worker.__module__ != "__main__":
+            # the fork server imports the worker module (fastembed, onnxruntime, tokenizers) once,
+            # so that every forked worker starts with it already loaded
+            _extend_forkserver_preload(self.ctx, [worker.__module__])
         self.processes: list[BaseProcess] = []
         self.queue_size = self.num_workers * max_internal_batch_size
         self.emergency_shutdown = False
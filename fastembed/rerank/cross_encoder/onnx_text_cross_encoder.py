@@ -1,5 +1,8 @@
+import threading
+from pathlib import Path
 from typing import Iterable, Any, Sequence, Optional
 
+import onnxruntime as ort
 from loguru import logger
 
 from fastembed.common import OnnxProvider
@@ -91,6 +94,8 @@ class OnnxTextCrossEncoder(TextCrossEncoderBase, OnnxCrossEncoderModel):
         device_ids: Optional[list[int]] = None,
         lazy_load: bool = False,
         device_id: Optional[int] = None,
+        quantization: str = "fp32",
+        inter_op_num_threads: Optional[int] = None,
         **kwargs,
     ):
         """
@@ -107,15 +112,26 @@ class OnnxTextCrossEncoder(TextCrossEncoderBase, OnnxCrossEncoderModel):
             device_ids (Optional[list[int]], optional): The list of device ids to use for data parallel processing in
                 workers. Should be used with `cuda=True`, mutually exclusive with `providers`. Defaults to None.
             lazy_load (bool, optional): Whether to load the model during class initialization or on demand.
-                Should be set to True when using multiple-gpu and parallel encoding. Defaults to False.
+                Should be set to True when using multiple-gpu and parallel encoding. With lazy loading, the model
+                is also downloaded on the first `rerank` call, unless `local_files_only` is set. Defaults to False.
             device_id (Optional[int], optional): The device id to use for loading the model in the worker process.
+            quantization (str, optional): Precision of the model weights, either "fp32" or "int8".
+                int8 weights are quantized once and cached next to the model, they are only used with the
+                CPU execution provider. Defaults to "fp32".
+            inter_op_num_threads (int, optional): The number of threads used to run independent graph nodes
+                concurrently. When set, the session runs in parallel execution mode, otherwise nodes are run
+                sequentially and only parallelized internally with `threads`. Defaults to None.
 
         Raises:
             ValueError: If the model_name is not in the format <org>/<model> e.g. Xenova/ms-marco-MiniLM-L-6-v2.
+            ValueError: If the quantization is not supported.
         """
         super().__init__(model_name, cache_dir, threads, **kwargs)
+        self._check_quantization(quantization)
         self.providers = providers
         self.lazy_load = lazy_load
+        self.quantization = quantization
+        self.inter_op_num_threads = inter_op_num_threads
 
         # List of device ids, that can be used for data parallel processing in workers
         self.device_ids = device_ids
@@ -137,21 +153,61 @@ class OnnxTextCrossEncoder(TextCrossEncoderBase, OnnxCrossEncoderModel):
 
         self.model_description = self._get_model_description(model_name)
         self.cache_dir = define_cache_dir(cache_dir)
-        self._model_dir = self.download_model(
+        self._model_dir = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+        if self._local_files_only:
+            # looking up the cache is cheap, a missing model is reported on construction
+            self._model_dir = self._download_model()
+        if not self.lazy_load:
+            self._ensure_loaded()
+
+    def _download_model(self) -> Path:
+        return self.download_model(
             self.model_description, self.cache_dir, local_files_only=self._local_files_only
         )
 
-        if not self.lazy_load:
+    def _ensure_loaded(self) -> None:
+        """Download the model and load the onnx session on first use."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            if self._model_dir is None:
+                self._model_dir = self._download_model()
             self.load_onnx_model()
+            self._loaded = True
 
     def load_onnx_model(self) -> None:
+        # by default a sequential graph executor avoids spinning up an inter-op thread pool next to
+        # the intra-op one, parallel execution is opt-in as it only pays off on spare cores
+        so = ort.SessionOptions()
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        so.enable_mem_pattern = True
+        so.intra_op_num_threads = self.threads or 0
+        if self.inter_op_num_threads is not None:
+            so.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+            so.inter_op_num_threads = self.inter_op_num_threads
+        else:
+            so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+        model_file = self._quantized_model_file(
+            self._model_dir,
+            self.model_description["model_file"],
+            self.quantization,
+            providers=self.providers,
+            cuda=self.cuda,
+        )
         self._load_onnx_model(
             model_dir=self._model_dir,
-            model_file=self.model_description["model_file"],
+            model_file=model_file,
             threads=self.threads,
             providers=self.providers,
             cuda=self.cuda,
             device_id=self.device_id,
+            session_options=so,
         )
 
     def rerank(
@@ -171,7 +227,7 @@ class OnnxTextCrossEncoder(TextCrossEncoderBase, OnnxCrossEncoderModel):
         Returns:
             Iterable[float]: An iterable of relevance scores for each document.
         """
-
-        yield from self._rerank_documents(
+        self._ensure_loaded()
+        return self._rerank_documents(
             query=query, documents=documents, batch_size=batch_size, **kwargs
         )
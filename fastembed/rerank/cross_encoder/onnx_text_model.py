@@ -2,15 +2,18 @@ from typing import Sequence, Optional, Iterable
 from pathlib import Path
 
 import numpy as np
+import onnxruntime as ort
 from tokenizers import Encoding
 
 from fastembed.common.onnx_model import OnnxModel, OnnxProvider, OnnxOutputContext
 from fastembed.common.preprocessor_utils import load_tokenizer
-from fastembed.common.utils import iter_batch
+from fastembed.common.utils import iter_batch, map_length_sorted_batches
 
 
 class OnnxCrossEncoderModel(OnnxModel):
     ONNX_OUTPUT_NAMES: Optional[list[str]] = None
+    # Whether documents can be regrouped into batches of similar length
+    SORT_BATCHES_BY_LENGTH: bool = True
 
     def _load_onnx_model(
         self,
@@ -20,6 +23,7 @@ class OnnxCrossEncoderModel(OnnxModel):
         providers: Optional[Sequence[OnnxProvider]] = None,
         cuda: bool = False,
         device_id: Optional[int] = None,
+        session_options: Optional[ort.SessionOptions] = None,
     ) -> None:
         super()._load_onnx_model(
             model_dir=model_dir,
@@ -28,6 +32,7 @@ class OnnxCrossEncoderModel(OnnxModel):
             providers=providers,
             cuda=cuda,
             device_id=device_id,
+            session_options=session_options,
         )
         self.tokenizer, _ = load_tokenizer(model_dir=model_dir)
 
@@ -50,17 +55,48 @@ class OnnxCrossEncoderModel(OnnxModel):
             )
 
         onnx_input = self._preprocess_onnx_input(inputs, **kwargs)
-        outputs = self.model.run(self.ONNX_OUTPUT_NAMES, onnx_input)
+        outputs = self._run_model(onnx_input, self.ONNX_OUTPUT_NAMES)
         return OnnxOutputContext(model_output=outputs[0][:, 0].tolist())
 
     def _rerank_documents(
-        self, query: str, documents: Iterable[str], batch_size: int, **kwargs
+        self,
+        query: str,
+        documents: Iterable[str],
+        batch_size: int,
+        length_sort: bool = True,
+        **kwargs,
     ) -> Iterable[float]:
         if not hasattr(self, "model") or self.model is None:
             self.load_onnx_model()
+        if isinstance(documents, str):
+            documents = [documents]
+        if (
+            length_sort
+            and self.SORT_BATCHES_BY_LENGTH
+            and isinstance(documents, list)
+            and len(documents) > batch_size
+        ):
+            yield from self._rerank_length_sorted(query, documents, batch_size, **kwargs)
+            return
         for batch in iter_batch(documents, batch_size):
             yield from self.onnx_embed(query, batch, **kwargs).model_output
 
+    def _rerank_length_sorted(
+        self, query: str, documents: list[str], batch_size: int, **kwargs
+    ) -> Iterable[float]:
+        """
+        Score documents in batches of similar length, so that a single long document doesn't
+        inflate the padding of the whole batch. Scores are yielded in the original order.
+        """
+
+        def process(
+            batches: Iterable[tuple[list[int], list[str]]],
+        ) -> Iterable[tuple[list[int], list[float]]]:
+            for positions, batch in batches:
+                yield positions, self.onnx_embed(query, batch, **kwargs).model_output
+
+        yield from map_length_sorted_batches(documents, batch_size, process)
+
     def _preprocess_onnx_input(
         self, onnx_input: dict[str, np.ndarray], **kwargs
     ) -> dict[str, np.ndarray]:
@@ -33,10 +33,11 @@ class TextCrossEncoder(TextCrossEncoderBase):
                 ]
                 ```
         """
-        result = []
-        for encoder in cls.CROSS_ENCODER_REGISTRY:
-            result.extend(encoder.list_supported_models())
-        return result
+        return list(cls._supported_models())
+
+    @classmethod
+    def _model_registry(cls) -> Sequence[Type[TextCrossEncoderBase]]:
+        return cls.CROSS_ENCODER_REGISTRY
 
     def __init__(
         self,
@@ -51,20 +52,20 @@ class TextCrossEncoder(TextCrossEncoderBase):
     ):
         super().__init__(model_name, cache_dir, threads, **kwargs)
 
-        for CROSS_ENCODER_TYPE in self.CROSS_ENCODER_REGISTRY:
-            supported_models = CROSS_ENCODER_TYPE.list_supported_models()
-            if any(model_name.lower() == model["model"].lower() for model in supported_models):
-                self.model = CROSS_ENCODER_TYPE(
-                    model_name=model_name,
-                    cache_dir=cache_dir,
-                    threads=threads,
-                    providers=providers,
-                    cuda=cuda,
-                    device_ids=device_ids,
-                    lazy_load=lazy_load,
-                    **kwargs,
-                )
-                return
+        CROSS_ENCODER_TYPE = self._resolve_model_type(model_name)
+
+        if CROSS_ENCODER_TYPE is not None:
+            self.model = CROSS_ENCODER_TYPE(
+                model_name=model_name,
+                cache_dir=cache_dir,
+                threads=threads,
+                providers=providers,
+                cuda=cuda,
+                device_ids=device_ids,
+                lazy_load=lazy_load,
+                **kwargs,
+            )
+            return
 
         raise ValueError(
             f"Model {model_name} is not supported in TextCrossEncoder."
@@ -84,4 +85,4 @@ class TextCrossEncoder(TextCrossEncoderBase):
         Returns:
             Iterable of scores for each document
         """
-        yield from self.model.rerank(query, documents, batch_size=batch_size, **kwargs)
+        return self.model.rerank(query, documents, batch_size=batch_size, **kwargs)
@@ -12,6 +12,7 @@ from fastembed.common.utils import (
     iter_batch,
     get_all_punctuation,
     remove_non_alphanumeric,
+    remove_non_alphanumeric_batch,
 )
 from fastembed.parallel_processor import ParallelWorkerPool, Worker
 from fastembed.sparse.sparse_embedding_base import (
@@ -126,7 +127,7 @@ class Bm25(SparseTextEmbeddingBase):
         )
 
         self.token_max_length = token_max_length
-        self.punctuation = set(get_all_punctuation())
+        self.punctuation = get_all_punctuation()
         self.stopwords = set(self._load_stopwords(self._model_dir, self.language))
 
         self.stemmer = SnowballStemmer(language)
@@ -168,7 +169,8 @@ class Bm25(SparseTextEmbeddingBase):
             if len(documents) < batch_size:
                 is_small = True
 
-        if parallel is None or is_small:
+        # a single worker process would only add startup and transfer costs to the same work
+        if parallel is None or parallel == 1 or is_small:
             for batch in iter_batch(documents, batch_size):
                 yield from self.raw_embed(batch)
         else:
@@ -214,7 +216,7 @@ class Bm25(SparseTextEmbeddingBase):
         Returns:
             List of embeddings, one per document
         """
-        yield from self._embed_documents(
+        return self._embed_documents(
             model_name=self.model_name,
             cache_dir=str(self.cache_dir),
             documents=documents,
@@ -245,8 +247,7 @@ class Bm25(SparseTextEmbeddingBase):
         documents: list[str],
     ) -> list[SparseEmbedding]:
         embeddings = []
-        for document in documents:
-            document = remove_non_alphanumeric(document)
+        for document in remove_non_alphanumeric_batch(documents):
             tokens = self.tokenizer.tokenize(document)
             stemmed_tokens = self._stem(tokens)
             token_id2value = self._term_frequency(stemmed_tokens)
@@ -285,7 +285,7 @@ class Bm42(SparseTextEmbeddingBase, OnnxTextModel[SparseEmbedding]):
         Returns:
             List of embeddings, one per document
         """
-        yield from self._embed_documents(
+        return self._embed_documents(
             model_name=self.model_name,
             cache_dir=str(self.cache_dir),
             documents=documents,
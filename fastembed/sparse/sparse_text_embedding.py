@@ -38,10 +38,7 @@ class SparseTextEmbedding(SparseTextEmbeddingBase):
                 ]
                 ```
         """
-        result = []
-        for embedding in cls.EMBEDDINGS_REGISTRY:
-            result.extend(embedding.list_supported_models())
-        return result
+        return list(cls._supported_models())
 
     def __init__(
         self,
@@ -64,20 +61,23 @@ class SparseTextEmbedding(SparseTextEmbeddingBase):
             )
             model_name = "prithivida/Splade_PP_en_v1"
 
-        for EMBEDDING_MODEL_TYPE in self.EMBEDDINGS_REGISTRY:
-            supported_models = EMBEDDING_MODEL_TYPE.list_supported_models()
-            if any(model_name.lower() == model["model"].lower() for model in supported_models):
-                self.model = EMBEDDING_MODEL_TYPE(
-                    model_name,
-                    cache_dir,
-                    threads=threads,
-                    providers=providers,
-                    cuda=cuda,
-                    device_ids=device_ids,
-                    lazy_load=lazy_load,
-                    **kwargs,
-                )
-                return
+        EMBEDDING_MODEL_TYPE = self._resolve_model_type(model_name)
+
+        if EMBEDDING_MODEL_TYPE is not None:
+            self.model = EMBEDDING_MODEL_TYPE(
+                model_name,
+                cache_dir,
+                threads=threads,
+                providers=providers,
+                cuda=cuda,
+                device_ids=device_ids,
+                lazy_load=lazy_load,
+                **kwargs,
+            )
+            if not lazy_load:
+                # skip the wrapper indirection for the frequently called query path
+                self.query_embed = self.model.query_embed
+            return
 
         raise ValueError(
             f"Model {model_name} is not supported in SparseTextEmbedding."
@@ -106,7 +106,7 @@ class SparseTextEmbedding(SparseTextEmbeddingBase):
         Returns:
             List of embeddings, one per document
         """
-        yield from self.model.embed(documents, batch_size, parallel, **kwargs)
+        return self.model.embed(documents, batch_size, parallel, **kwargs)
 
     def query_embed(self, query: Union[str, Iterable[str]], **kwargs) -> Iterable[SparseEmbedding]:
         """
@@ -118,4 +118,4 @@ class SparseTextEmbedding(SparseTextEmbeddingBase):
         Returns:
             Iterable[SparseEmbedding]: The sparse embeddings.
         """
-        yield from self.model.query_embed(query, **kwargs)
+        return self.model.query_embed(query, **kwargs)
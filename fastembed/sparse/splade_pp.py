@@ -153,7 +153,7 @@ class SpladePP(SparseTextEmbeddingBase, OnnxTextModel[SparseEmbedding]):
         Returns:
             List of embeddings, one per document
         """
-        yield from self._embed_documents(
+        return self._embed_documents(
             model_name=self.model_name,
             cache_dir=str(self.cache_dir),
             documents=documents,
@@ -190,6 +190,7 @@ class OnnxTextEmbedding(TextEmbeddingBase, OnnxTextModel[np.ndarray]):
         device_ids: Optional[list[int]] = None,
         lazy_load: bool = False,
         device_id: Optional[int] = None,
+        quantization: str = "fp32",
         **kwargs,
     ):
         """
@@ -208,13 +209,19 @@ class OnnxTextEmbedding(TextEmbeddingBase, OnnxTextModel[np.ndarray]):
             lazy_load (bool, optional): Whether to load the model during class initialization or on demand.
                 Should be set to True when using multiple-gpu and parallel encoding. Defaults to False.
             device_id (Optional[int], optional): The device id to use for loading the model in the worker process.
+            quantization (str, optional): Precision of the model weights, either "fp32" or "int8".
+                int8 weights are quantized once and cached next to the model, they are only used with the
+                CPU execution provider. Defaults to "fp32".
 
         Raises:
             ValueError: If the model_name is not in the format <org>/<model> e.g. BAAI/bge-base-en.
+            ValueError: If the quantization is not supported.
         """
         super().__init__(model_name, cache_dir, threads, **kwargs)
+        self._check_quantization(quantization)
         self.providers = providers
         self.lazy_load = lazy_load
+        self.quantization = quantization
 
         # List of device ids, that can be used for data parallel processing in workers
         self.device_ids = device_ids
@@ -259,7 +266,7 @@ class OnnxTextEmbedding(TextEmbeddingBase, OnnxTextModel[np.ndarray]):
         Returns:
             List of embeddings, one per document
         """
-        yield from self._embed_documents(
+        return self._embed_documents(
             model_name=self.model_name,
             cache_dir=str(self.cache_dir),
             documents=documents,
@@ -268,6 +275,7 @@ class OnnxTextEmbedding(TextEmbeddingBase, OnnxTextModel[np.ndarray]):
             providers=self.providers,
             cuda=self.cuda,
             device_ids=self.device_ids,
+            quantization=self.quantization,
             **kwargs,
         )
 
@@ -285,12 +293,23 @@ class OnnxTextEmbedding(TextEmbeddingBase, OnnxTextModel[np.ndarray]):
 
     def _post_process_onnx_output(self, output: OnnxOutputContext) -> Iterable[np.ndarray]:
         embeddings = output.model_output
-        return normalize(embeddings[:, 0]).astype(np.float32)
+        # a single copy gathers the CLS rows in fp32, even if the session returns lower precision
+        # outputs, they are then normalized in place. `np.array` always copies, a view of a single
+        # row would write into the model output and keep all of its hidden states alive
+        cls_embeddings = np.array(embeddings[:, 0], dtype=np.float32)
+        return normalize(cls_embeddings, out=cls_embeddings)
 
     def load_onnx_model(self) -> None:
+        model_file = self._quantized_model_file(
+            self._model_dir,
+            self.model_description["model_file"],
+            self.quantization,
+            providers=self.providers,
+            cuda=self.cuda,
+        )
         self._load_onnx_model(
             model_dir=self._model_dir,
-            model_file=self.model_description["model_file"],
+            model_file=model_file,
             threads=self.threads,
             providers=self.providers,
             cuda=self.cuda,
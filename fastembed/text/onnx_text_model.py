@@ -1,20 +1,43 @@
+import math
 import os
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from multiprocessing import get_all_start_methods
 from pathlib import Path
 from typing import Any, Iterable, Optional, Sequence, Type, Union
 
 import numpy as np
-from tokenizers import Encoding
+from tokenizers import Encoding, Tokenizer
 
 from fastembed.common import OnnxProvider
-from fastembed.common.onnx_model import EmbeddingWorker, OnnxModel, OnnxOutputContext, T
+from fastembed.common.onnx_model import (
+    EmbeddingWorker,
+    OnnxModel,
+    OnnxOutputContext,
+    T,
+    _restore_output,
+    _share_output,
+)
 from fastembed.common.preprocessor_utils import load_tokenizer
-from fastembed.common.utils import iter_batch
+from fastembed.common.utils import iter_batch, map_length_sorted_batches
 from fastembed.parallel_processor import ParallelWorkerPool
 
 
+# Large batches are tokenized by several tokenizer copies in parallel threads
+max_tokenizer_shards = 8
+min_documents_per_tokenizer_shard = 32
+
+# Batches tokenized or inferred ahead of the one being post-processed
+prefetch_batches = 2
+
+
 class OnnxTextModel(OnnxModel[T]):
     ONNX_OUTPUT_NAMES: Optional[list[str]] = None
+    # Whether documents can be regrouped into batches of similar length,
+    # requires the output of each document not to depend on the padding of its batch
+    SORT_BATCHES_BY_LENGTH: bool = True
 
     @classmethod
     def _get_worker_class(cls) -> Type["TextEmbeddingWorker"]:
@@ -27,6 +50,11 @@ class OnnxTextModel(OnnxModel[T]):
         super().__init__()
         self.tokenizer = None
         self.special_token_to_id = {}
+        self._num_tokenizer_shards = 1
+        self._tokenizer_shards: list[Tokenizer] = []
+        self._tokenizer_executor: Optional[ThreadPoolExecutor] = None
+        self._tokenizer_shards_lock = threading.Lock()
+        self._zeros_buffer = np.zeros(0, dtype=np.int64)
 
     def _preprocess_onnx_input(
         self, onnx_input: dict[str, np.ndarray], **kwargs
@@ -54,39 +82,139 @@ class OnnxTextModel(OnnxModel[T]):
             device_id=device_id,
         )
         self.tokenizer, self.special_token_to_id = load_tokenizer(model_dir=model_dir)
+        # tokenizer copies are created on first use, after subclasses finished configuring
+        # truncation and padding of the original tokenizer
+        self._num_tokenizer_shards = min(max_tokenizer_shards, threads or os.cpu_count() or 1)
+        if getattr(self, "_tokenizer_executor", None) is not None:
+            self._tokenizer_executor.shutdown(wait=False)
+        self._tokenizer_shards = []
+        self._tokenizer_executor = None
+        self._tokenizer_shards_lock = threading.Lock()
+        self._zeros_buffer = np.zeros(0, dtype=np.int64)
 
     def load_onnx_model(self) -> None:
         raise NotImplementedError("Subclasses must implement this method")
 
     def tokenize(self, documents: list[str], **kwargs) -> list[Encoding]:
-        return self.tokenizer.encode_batch(documents)
+        return self._encode_batch(documents)
+
+    def _encode_batch(self, documents: list[str]) -> list[Encoding]:
+        """
+        Encode a batch of documents.
+
+        `encode_batch` of a single tokenizer scales poorly on machines with many cores, so large
+        batches are split into shards, each encoded by its own tokenizer copy in a separate thread.
+        Shards are padded independently, encodings are padded to a common length afterwards.
+        """
+        num_shards = min(
+            self._num_tokenizer_shards, len(documents) // min_documents_per_tokenizer_shard
+        )
+        if num_shards < 2:
+            return self.tokenizer.encode_batch(documents)
+
+        if not self._tokenizer_shards:
+            self._create_tokenizer_shards()
+
+        shard_size = math.ceil(len(documents) / num_shards)
+        futures = [
+            self._tokenizer_executor.submit(
+                tokenizer.encode_batch, documents[i * shard_size : (i + 1) * shard_size]
+            )
+            for i, tokenizer in enumerate(self._tokenizer_shards[:num_shards])
+        ]
+        encoded = [encoding for future in futures for encoding in future.result()]
+
+        padding = self.tokenizer.padding
+        if padding is not None:
+            max_length = max(len(encoding) for encoding in encoded)
+            if padding["pad_to_multiple_of"]:
+                max_length = math.ceil(max_length / padding["pad_to_multiple_of"])
+                max_length *= padding["pad_to_multiple_of"]
+            for encoding in encoded:
+                encoding.pad(
+                    max_length,
+                    direction=padding["direction"],
+                    pad_id=padding["pad_id"],
+                    pad_type_id=padding["pad_type_id"],
+                    pad_token=padding["pad_token"],
+                )
+        return encoded
+
+    def _create_tokenizer_shards(self) -> None:
+        with self._tokenizer_shards_lock:
+            if self._tokenizer_shards:
+                # created by another thread in the meantime
+                return
+            serialized_tokenizer = self.tokenizer.to_str()
+            executor = ThreadPoolExecutor(max_workers=self._num_tokenizer_shards)
+            # the executor threads are stopped once the model is garbage collected
+            weakref.finalize(self, executor.shutdown, wait=False)
+            self._tokenizer_executor = executor
+            self._tokenizer_shards = [
+                Tokenizer.from_str(serialized_tokenizer) for _ in range(self._num_tokenizer_shards)
+            ]
+
+    def _zeros(self, shape: tuple[int, int]) -> np.ndarray:
+        """
+        Read-only int64 zeros of the given shape, viewed from a buffer shared between batches.
+        """
+        size = shape[0] * shape[1]
+        if self._zeros_buffer.size < size:
+            self._zeros_buffer = np.zeros(max(size, 2 * self._zeros_buffer.size), dtype=np.int64)
+            self._zeros_buffer.flags.writeable = False
+        return self._zeros_buffer[:size].reshape(shape)
 
     def onnx_embed(
         self,
         documents: list[str],
         **kwargs,
     ) -> OnnxOutputContext:
+        return self._run_onnx_input(*self._prepare_onnx_input(documents, **kwargs))
+
+    def _prepare_onnx_input(
+        self, documents: list[str], **kwargs
+    ) -> tuple[dict[str, np.ndarray], np.ndarray, np.ndarray]:
+        """
+        Tokenize documents into model inputs.
+
+        Returns:
+            tuple[dict[str, np.ndarray], np.ndarray, np.ndarray]: The model inputs,
+                the attention mask and the input ids of the batch.
+        """
         encoded = self.tokenize(documents, **kwargs)
-        input_ids = np.array([e.ids for e in encoded])
-        attention_mask = np.array([e.attention_mask for e in encoded])
+        # padding is enabled in the tokenizer, all encodings in the batch have the same length
+        seq_len = len(encoded[0]) if encoded else 0
+        input_ids = np.empty((len(encoded), seq_len), dtype=np.int64)
+        attention_mask = np.empty((len(encoded), seq_len), dtype=np.int64)
+        for i, encoding in enumerate(encoded):
+            input_ids[i] = encoding.ids
+            attention_mask[i] = encoding.attention_mask
+
         input_names = {node.name for node in self.model.get_inputs()}
         onnx_input = {
-            "input_ids": np.array(input_ids, dtype=np.int64),
+            "input_ids": input_ids,
         }
         if "attention_mask" in input_names:
-            onnx_input["attention_mask"] = np.array(attention_mask, dtype=np.int64)
+            onnx_input["attention_mask"] = attention_mask
         if "token_type_ids" in input_names:
-            onnx_input["token_type_ids"] = np.array(
-                [np.zeros(len(e), dtype=np.int64) for e in input_ids], dtype=np.int64
-            )
+            # single segment input, token types are always zero
+            onnx_input["token_type_ids"] = self._zeros(input_ids.shape)
 
         onnx_input = self._preprocess_onnx_input(onnx_input, **kwargs)
+        return (
+            onnx_input,
+            onnx_input.get("attention_mask", attention_mask),
+            onnx_input.get("input_ids", input_ids),
+        )
 
-        model_output = self.model.run(self.ONNX_OUTPUT_NAMES, onnx_input)
+    def _run_onnx_input(
+        self, onnx_input: dict[str, np.ndarray], attention_mask: np.ndarray, input_ids: np.ndarray
+    ) -> OnnxOutputContext:
+        model_output = self._run_model(onnx_input, self.ONNX_OUTPUT_NAMES)
         return OnnxOutputContext(
             model_output=model_output[0],
-            attention_mask=onnx_input.get("attention_mask", attention_mask),
-            input_ids=onnx_input.get("input_ids", input_ids),
+            attention_mask=attention_mask,
+            input_ids=input_ids,
         )
 
     def _embed_documents(
@@ -99,9 +227,11 @@ class OnnxTextModel(OnnxModel[T]):
         providers: Optional[Sequence[OnnxProvider]] = None,
         cuda: bool = False,
         device_ids: Optional[list[int]] = None,
+        length_sort: bool = True,
         **kwargs,
     ) -> Iterable[T]:
         is_small = False
+        length_sort = length_sort and self.SORT_BATCHES_BY_LENGTH
 
         if isinstance(documents, str):
             documents = [documents]
@@ -111,11 +241,19 @@ class OnnxTextModel(OnnxModel[T]):
             if len(documents) < batch_size:
                 is_small = True
 
-        if parallel is None or is_small:
+        # a single worker process would only add startup and transfer costs to the same work
+        if parallel is None or parallel == 1 or is_small:
             if not hasattr(self, "model") or self.model is None:
                 self.load_onnx_model()
-            for batch in iter_batch(documents, batch_size):
-                yield from self._post_process_onnx_output(self.onnx_embed(batch))
+            if is_small:
+                for batch in iter_batch(documents, batch_size):
+                    yield from self._post_process_onnx_output(self.onnx_embed(batch))
+            elif length_sort and isinstance(documents, list):
+                yield from self._embed_length_sorted(documents, batch_size)
+            else:
+                batches = enumerate(iter_batch(documents, batch_size))
+                for _, onnx_output in self._onnx_embed_pipelined(batches):
+                    yield from self._post_process_onnx_output(onnx_output)
         else:
             if parallel == 0:
                 parallel = os.cpu_count()
@@ -135,12 +273,87 @@ class OnnxTextModel(OnnxModel[T]):
                 device_ids=device_ids,
                 start_method=start_method,
             )
-            for batch in pool.ordered_map(iter_batch(documents, batch_size), **params):
-                yield from self._post_process_onnx_output(batch)
+            if length_sort and isinstance(documents, list):
+                yield from self._embed_length_sorted(documents, batch_size, pool, params)
+            else:
+                for batch in pool.ordered_map(iter_batch(documents, batch_size), **params):
+                    yield from self._post_process_onnx_output(_restore_output(batch))
+
+    def _embed_length_sorted(
+        self,
+        documents: list[str],
+        batch_size: int,
+        pool: Optional[ParallelWorkerPool] = None,
+        params: Optional[dict[str, Any]] = None,
+    ) -> Iterable[T]:
+        """
+        Embed documents in batches of similar length, so that a single long document doesn't
+        inflate the padding of the whole batch. Embeddings are yielded in the original order.
+        Batches are inferred in the current process, or by the workers of `pool` if it is given.
+        """
+
+        def process(
+            batches: Iterable[tuple[list[int], list[str]]],
+        ) -> Iterable[tuple[list[int], Iterable[T]]]:
+            if pool is None:
+                onnx_outputs = self._onnx_embed_pipelined(batches)
+            else:
+                onnx_outputs = self._onnx_embed_parallel(pool, batches, params or {})
+            for positions, onnx_output in onnx_outputs:
+                yield positions, self._post_process_onnx_output(onnx_output)
+
+        yield from map_length_sorted_batches(documents, batch_size, process)
+
+    def _onnx_embed_pipelined(
+        self, batches: Iterable[tuple[Any, list[str]]]
+    ) -> Iterable[tuple[Any, OnnxOutputContext]]:
+        """
+        Run `onnx_embed` on keyed batches as a pipeline of background threads: while the caller
+        post-processes a batch, the next one is inferred and the one after it is tokenized.
+        Tokenization and inference release the GIL, so the stages overlap.
+        At most `prefetch_batches` batches are in flight, which bounds the memory they hold.
+        """
+
+        def run(prepared: Future) -> OnnxOutputContext:
+            return self._run_onnx_input(*prepared.result())
+
+        pending: deque = deque()
+        with ThreadPoolExecutor(max_workers=1) as tokenizer_executor:
+            with ThreadPoolExecutor(max_workers=1) as model_executor:
+                for key, batch in batches:
+                    prepared = tokenizer_executor.submit(self._prepare_onnx_input, batch)
+                    # a single model thread runs batches in submission order
+                    pending.append((key, model_executor.submit(run, prepared)))
+                    if len(pending) > prefetch_batches:
+                        pending_key, pending_future = pending.popleft()
+                        yield pending_key, pending_future.result()
+                while pending:
+                    pending_key, pending_future = pending.popleft()
+                    yield pending_key, pending_future.result()
+
+    @staticmethod
+    def _onnx_embed_parallel(
+        pool: ParallelWorkerPool,
+        batches: Iterable[tuple[Any, list[str]]],
+        params: dict[str, Any],
+    ) -> Iterable[tuple[Any, OnnxOutputContext]]:
+        """
+        Run `onnx_embed` on keyed batches in the workers of `pool`. Only the batches are sent to
+        the workers, keys wait in a queue, as outputs come back in submission order.
+        """
+        keys: deque = deque()
+
+        def stream() -> Iterable[list[str]]:
+            for key, batch in batches:
+                keys.append(key)
+                yield batch
+
+        for onnx_output in pool.ordered_map(stream(), **params):
+            yield keys.popleft(), _restore_output(onnx_output)
 
 
 class TextEmbeddingWorker(EmbeddingWorker):
     def process(self, items: Iterable[tuple[int, Any]]) -> Iterable[tuple[int, Any]]:
         for idx, batch in items:
             onnx_output = self.model.onnx_embed(batch)
-            yield idx, onnx_output
+            yield idx, _share_output(onnx_output)
@@ -51,11 +51,10 @@ class PooledEmbedding(OnnxTextEmbedding):
     @classmethod
     def mean_pooling(cls, model_output: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
         token_embeddings = model_output
-        input_mask_expanded = np.expand_dims(attention_mask, axis=-1)
-        input_mask_expanded = np.tile(input_mask_expanded, (1, 1, token_embeddings.shape[-1]))
-        input_mask_expanded = input_mask_expanded.astype(float)
-        sum_embeddings = np.sum(token_embeddings * input_mask_expanded, axis=1)
-        sum_mask = np.sum(input_mask_expanded, axis=1)
+        # contract over the sequence axis directly instead of materializing a (B, L, D) mask
+        input_mask = attention_mask.astype(np.float32, copy=False)
+        sum_embeddings = np.einsum("bld,bl->bd", token_embeddings, input_mask)
+        sum_mask = input_mask.sum(axis=1, keepdims=True)
         pooled_embeddings = sum_embeddings / np.maximum(sum_mask, 1e-9)
         return pooled_embeddings
 
@@ -74,7 +73,7 @@ class PooledEmbedding(OnnxTextEmbedding):
 
         embeddings = output.model_output
         attn_mask = output.attention_mask
-        return self.mean_pooling(embeddings, attn_mask).astype(np.float32)
+        return self.mean_pooling(embeddings, attn_mask).astype(np.float32, copy=False)
 
 
 class PooledEmbeddingWorker(OnnxTextEmbeddingWorker):
@@ -98,7 +98,7 @@ class PooledNormalizedEmbedding(PooledEmbedding):
 
         embeddings = output.model_output
         attn_mask = output.attention_mask
-        return normalize(self.mean_pooling(embeddings, attn_mask)).astype(np.float32)
+        return normalize(self.mean_pooling(embeddings, attn_mask)).astype(np.float32, copy=False)
 
 
 class PooledNormalizedEmbeddingWorker(OnnxTextEmbeddingWorker):
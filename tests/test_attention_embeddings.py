@@ -85,11 +85,15 @@ def test_parallel_processing(model_name):
 
     assert len(embeddings) == len(docs)
 
-    for emb_1, emb_2, emb_3 in zip(embeddings, embeddings_2, embeddings_3):
-        assert np.allclose(emb_1.indices, emb_2.indices)
-        assert np.allclose(emb_1.indices, emb_3.indices)
-        assert np.allclose(emb_1.values, emb_2.values)
-        assert np.allclose(emb_1.values, emb_3.values)
+    sizes = [len(emb.indices) for emb in embeddings]
+    indices = np.concatenate([emb.indices for emb in embeddings])
+    values = np.concatenate([emb.values for emb in embeddings])
+
+    for other_embeddings in (embeddings_2, embeddings_3):
+        assert len(other_embeddings) == len(docs)
+        assert [len(emb.indices) for emb in other_embeddings] == sizes
+        assert np.allclose(indices, np.concatenate([emb.indices for emb in other_embeddings]))
+        assert np.allclose(values, np.concatenate([emb.values for emb in other_embeddings]))
 
     if is_ci:
         delete_model_cache(model.model._model_dir)
@@ -0,0 +1,69 @@
+import shutil
+from pathlib import Path
+from unittest import mock
+
+from fastembed.common.model_management import SNAPSHOT_MANIFEST_DIR, ModelManagement
+
+REPO = "qdrant/test-model"
+REPO_DIR_NAME = "models--qdrant--test-model"
+FILES = ["config.json", "tokenizer.json", "model.onnx"]
+
+
+def fake_snapshot_download(revision: str):
+    """Mimics the layout `snapshot_download` leaves in the cache for the given revision."""
+
+    def snapshot_download(repo_id, allow_patterns, cache_dir, local_files_only, **kwargs):
+        repo_dir = Path(cache_dir) / REPO_DIR_NAME
+        snapshot_path = repo_dir / "snapshots" / revision
+        snapshot_path.mkdir(parents=True, exist_ok=True)
+        for file in FILES:
+            (snapshot_path / file).write_text(file)
+        (repo_dir / "refs").mkdir(exist_ok=True)
+        (repo_dir / "refs" / "main").write_text(revision)
+        return str(snapshot_path)
+
+    return mock.patch(
+        "fastembed.common.model_management.snapshot_download",
+        side_effect=snapshot_download,
+    )
+
+
+def download(cache_dir: Path) -> str:
+    return ModelManagement.download_files_from_huggingface(
+        REPO, cache_dir=str(cache_dir), extra_patterns=["model.onnx"]
+    )
+
+
+def test_cached_snapshot_skips_download(tmp_path):
+    with fake_snapshot_download("rev1") as snapshot_download:
+        model_dir = download(tmp_path)
+        assert snapshot_download.call_count == 1
+
+        assert download(tmp_path) == model_dir
+        assert snapshot_download.call_count == 1
+
+    # the snapshot directory owned by huggingface_hub is left untouched
+    assert sorted(path.name for path in Path(model_dir).iterdir()) == sorted(FILES)
+    assert (tmp_path / SNAPSHOT_MANIFEST_DIR / f"{REPO_DIR_NAME}.json").is_file()
+
+
+def test_stale_snapshot_is_downloaded(tmp_path):
+    with fake_snapshot_download("rev1") as snapshot_download:
+        model_dir = download(tmp_path)
+
+        # a file listed in the manifest is gone
+        (Path(model_dir) / "model.onnx").unlink()
+        assert download(tmp_path) == model_dir
+        assert snapshot_download.call_count == 2
+
+    # the main revision has moved on since the manifest was written, e.g. by another client
+    repo_dir = tmp_path / REPO_DIR_NAME
+    shutil.copytree(repo_dir / "snapshots" / "rev1", repo_dir / "snapshots" / "rev2")
+    (repo_dir / "refs" / "main").write_text("rev2")
+    with fake_snapshot_download("rev2") as snapshot_download:
+        model_dir = download(tmp_path)
+        assert snapshot_download.call_count == 1
+        assert Path(model_dir).name == "rev2"
+
+        assert download(tmp_path) == model_dir
+        assert snapshot_download.call_count == 1
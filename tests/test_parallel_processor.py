@@ -0,0 +1,33 @@
+import multiprocessing
+from multiprocessing import forkserver
+
+import pytest
+
+from fastembed.parallel_processor import ParallelWorkerPool
+from fastembed.text.onnx_embedding import OnnxTextEmbeddingWorker
+
+
+@pytest.mark.skipif(
+    "forkserver" not in multiprocessing.get_all_start_methods(),
+    reason="forkserver is not available",
+)
+def test_forkserver_preload_keeps_application_modules():
+    preload_before = list(forkserver._forkserver._preload_modules)
+    application_modules = ["__main__", "json", "decimal"]
+    try:
+        multiprocessing.set_forkserver_preload(application_modules)
+        ParallelWorkerPool(
+            num_workers=1, worker=OnnxTextEmbeddingWorker, start_method="forkserver"
+        )
+
+        preload = forkserver._forkserver._preload_modules
+        assert preload[: len(application_modules)] == application_modules
+        assert OnnxTextEmbeddingWorker.__module__ in preload
+
+        # the list is only extended once
+        ParallelWorkerPool(
+            num_workers=1, worker=OnnxTextEmbeddingWorker, start_method="forkserver"
+        )
+        assert forkserver._forkserver._preload_modules == preload
+    finally:
+        multiprocessing.set_forkserver_preload(preload_before)
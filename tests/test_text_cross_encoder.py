@@ -1,4 +1,7 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
 
 import numpy as np
 import pytest
@@ -80,3 +83,93 @@ def test_lazy_load(model_name):
 
     if is_ci:
         delete_model_cache(model.model._model_dir)
+
+
+@pytest.mark.parametrize(
+    "model_name",
+    ["Xenova/ms-marco-MiniLM-L-6-v2"],
+)
+def test_lazy_load_concurrent_rerank(model_name):
+    is_ci = os.getenv("CI")
+    model = TextCrossEncoder(model_name=model_name, lazy_load=True)
+    # the download is deferred to the first rerank as well
+    assert model.model._model_dir is None
+
+    query = "What is the capital of France?"
+    documents = ["Paris is the capital of France.", "Berlin is the capital of Germany."]
+    with mock.patch.object(
+        model.model, "load_onnx_model", wraps=model.model.load_onnx_model
+    ) as load_onnx_model:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: list(model.rerank(query, documents)), range(4)))
+    assert load_onnx_model.call_count == 1
+
+    canonical_scores = CANONICAL_SCORE_VALUES[model_name]
+    for scores in results:
+        assert np.allclose(scores, canonical_scores, atol=1e-3)
+
+    if is_ci:
+        delete_model_cache(model.model._model_dir)
+
+
+@pytest.mark.parametrize(
+    "model_name",
+    ["Xenova/ms-marco-MiniLM-L-6-v2"],
+)
+def test_lazy_load_errors(model_name, tmp_path):
+    # errors are still raised on construction, not on the first rerank
+    with pytest.raises(ValueError):
+        TextCrossEncoder(model_name="unknown/model", lazy_load=True)
+
+    with pytest.raises(ValueError):
+        TextCrossEncoder(
+            model_name=model_name, cache_dir=str(tmp_path), lazy_load=True, local_files_only=True
+        )
+
+
+@pytest.mark.parametrize(
+    "model_name",
+    ["Xenova/ms-marco-MiniLM-L-6-v2"],
+)
+def test_rerank_iterable_documents(model_name):
+    is_ci = os.getenv("CI")
+    model = TextCrossEncoder(model_name=model_name)
+
+    query = "What is the capital of France?"
+    documents = ["Paris is the capital of France.", "Berlin is the capital of Germany."]
+    canonical_scores = CANONICAL_SCORE_VALUES[model_name]
+
+    scores = np.array(list(model.rerank(query, documents[0])))
+    assert np.allclose(scores, canonical_scores[:1], atol=1e-3)
+
+    scores = np.array(list(model.rerank(query, (doc for doc in documents))))
+    assert np.allclose(scores, canonical_scores, atol=1e-3)
+
+    assert list(model.rerank(query, iter([]))) == []
+
+    if is_ci:
+        delete_model_cache(model.model._model_dir)
+
+
+@pytest.mark.parametrize(
+    "model_name",
+    ["Xenova/ms-marco-MiniLM-L-6-v2"],
+)
+def test_int8_quantization(model_name):
+    is_ci = os.getenv("CI")
+    model = TextCrossEncoder(model_name=model_name, quantization="int8")
+    assert list(Path(model.model._model_dir).rglob("*_int8.onnx"))
+
+    query = "What is the capital of France?"
+    documents = ["Paris is the capital of France.", "Berlin is the capital of Germany."]
+    scores = np.array(list(model.rerank(query, documents)))
+
+    canonical_scores = CANONICAL_SCORE_VALUES[model_name]
+    assert scores.shape == canonical_scores.shape
+    assert np.array_equal(np.argsort(scores), np.argsort(canonical_scores))
+
+    with pytest.raises(ValueError):
+        TextCrossEncoder(model_name=model_name, quantization="fp16")
+
+    if is_ci:
+        delete_model_cache(model.model._model_dir)
@@ -1,8 +1,13 @@
 import os
+import random
+from pathlib import Path
 
 import numpy as np
+import onnxruntime as ort
 import pytest
 
+from fastembed.common.onnx_model import _session_cache_key, shared_memory_min_bytes
+from fastembed.common.utils import length_sort_window_batches
 from fastembed.text.text_embedding import TextEmbedding
 from tests.utils import delete_model_cache
 
@@ -133,6 +138,199 @@ def test_parallel_processing(n_dims, model_name):
         delete_model_cache(model.model._model_dir)
 
 
+@pytest.mark.parametrize("model_name", ["BAAI/bge-small-en-v1.5"])
+@pytest.mark.parametrize("parallel", [None, 2])
+def test_length_sorted_embedding_order(model_name, parallel):
+    is_ci = os.getenv("CI")
+    model = TextEmbedding(model_name=model_name)
+
+    batch_size = 4
+    docs = [" ".join(["flag embedding"] * (i % 17 + 1)) + f" {i}" for i in range(200)]
+    random.Random(0).shuffle(docs)
+    # the documents are sorted by length within several windows
+    assert len(docs) > 4 * batch_size * length_sort_window_batches
+
+    embeddings = np.stack(list(model.embed(docs, batch_size=batch_size, parallel=parallel)))
+    expected = np.stack([next(iter(model.embed([doc]))) for doc in docs])
+
+    assert embeddings.shape == expected.shape
+    assert np.allclose(embeddings, expected, atol=1e-3)
+
+    if is_ci:
+        delete_model_cache(model.model._model_dir)
+
+
+@pytest.mark.parametrize("model_name", ["BAAI/bge-small-en-v1.5"])
+def test_sharded_tokenization(model_name):
+    is_ci = os.getenv("CI")
+    model = TextEmbedding(model_name=model_name)
+    onnx_model = model.model
+    tokenizer = onnx_model.tokenizer
+
+    # the longest document of each shard differs, shards are padded to different lengths
+    docs = [" ".join(["flag embedding"] * (i % 5 + i // 8 + 1)) for i in range(96)]
+
+    def assert_same_encodings() -> None:
+        # shards are created lazily with the padding of the tokenizer at that time
+        onnx_model._tokenizer_shards = []
+        onnx_model._num_tokenizer_shards = 3
+        encoded = onnx_model._encode_batch(docs)
+        expected = tokenizer.encode_batch(docs)
+
+        assert len(onnx_model._tokenizer_shards) == 3
+        assert len(encoded) == len(expected)
+        for encoding, expected_encoding in zip(encoded, expected):
+            assert encoding.ids == expected_encoding.ids
+            assert encoding.attention_mask == expected_encoding.attention_mask
+            assert encoding.type_ids == expected_encoding.type_ids
+
+    assert_same_encodings()
+
+    padding = tokenizer.padding
+    tokenizer.enable_padding(
+        pad_id=padding["pad_id"],
+        pad_type_id=padding["pad_type_id"],
+        pad_token=padding["pad_token"],
+        pad_to_multiple_of=8,
+    )
+    assert_same_encodings()
+
+    if is_ci:
+        delete_model_cache(onnx_model._model_dir)
+
+
+@pytest.mark.parametrize(
+    "n_dims,model_name",
+    [(384, "BAAI/bge-small-en-v1.5")],
+)
+def test_single_document_embedding_is_copied(n_dims, model_name):
+    is_ci = os.getenv("CI")
+    model = TextEmbedding(model_name=model_name)
+
+    onnx_output = model.model.onnx_embed(["hello world"])
+    embeddings = model.model._post_process_onnx_output(onnx_output)
+
+    assert embeddings.shape == (1, n_dims)
+    # the embedding must not be a view of, and keep alive, the hidden states of the model
+    assert not np.shares_memory(embeddings, onnx_output.model_output)
+
+    if is_ci:
+        delete_model_cache(model.model._model_dir)
+
+
+@pytest.mark.parametrize(
+    "n_dims,model_name",
+    [(384, "BAAI/bge-small-en-v1.5")],
+)
+def test_parallel_processing_shared_memory(n_dims, model_name):
+    is_ci = os.getenv("CI")
+    model = TextEmbedding(model_name=model_name)
+
+    batch_size = 256
+    docs = ["flag embedding " * 16] * (2 * batch_size)
+    # the hidden states of a batch are large enough to be passed through shared memory
+    num_tokens = len(model.model.tokenizer.encode(docs[0]))
+    assert batch_size * num_tokens * n_dims * 4 >= shared_memory_min_bytes
+
+    shm_dir = Path("/dev/shm")
+
+    def shared_memory_blocks() -> set[Path]:
+        return set(shm_dir.glob("psm_*")) if shm_dir.is_dir() else set()
+
+    blocks_before = shared_memory_blocks()
+    embeddings = np.stack(list(model.embed(docs, batch_size=batch_size, parallel=2)), axis=0)
+    embeddings_2 = np.stack(list(model.embed(docs, batch_size=batch_size, parallel=None)), axis=0)
+
+    assert embeddings.shape == (len(docs), n_dims)
+    assert np.allclose(embeddings, embeddings_2, atol=1e-3)
+    # every block created by the workers is released by the main process
+    assert shared_memory_blocks() <= blocks_before
+
+    if is_ci:
+        delete_model_cache(model.model._model_dir)
+
+
+@pytest.mark.parametrize(
+    "n_dims,model_name",
+    [(384, "BAAI/bge-small-en-v1.5")],
+)
+def test_query_embed(n_dims, model_name):
+    is_ci = os.getenv("CI")
+    model = TextEmbedding(model_name=model_name)
+
+    query = "hello world"
+    embeddings = np.stack(list(model.query_embed(query)), axis=0)
+    assert embeddings.shape == (1, n_dims)
+
+    embeddings_2 = np.stack(list(model.query_embed([query, query])), axis=0)
+    assert embeddings_2.shape == (2, n_dims)
+    assert np.allclose(embeddings[0], embeddings_2[0], atol=1e-3)
+
+    if is_ci:
+        delete_model_cache(model.model._model_dir)
+
+
+@pytest.mark.parametrize(
+    "model_name",
+    ["BAAI/bge-small-en-v1.5"],
+)
+def test_int8_quantization(model_name):
+    is_ci = os.getenv("CI")
+    docs = ["hello world", "flag embedding"]
+
+    model = TextEmbedding(model_name=model_name)
+    quantized_model = TextEmbedding(model_name=model_name, quantization="int8")
+    assert list(Path(quantized_model.model._model_dir).rglob("*_int8.onnx"))
+
+    embeddings = np.stack(list(model.embed(docs)), axis=0)
+    quantized_embeddings = np.stack(list(quantized_model.embed(docs)), axis=0)
+    assert quantized_embeddings.shape == embeddings.shape
+    # embeddings are normalized, the row-wise dot product is the cosine similarity
+    assert np.all(np.sum(embeddings * quantized_embeddings, axis=1) > 0.95)
+
+    with pytest.raises(ValueError):
+        TextEmbedding(model_name=model_name, quantization="fp16")
+
+    if is_ci:
+        delete_model_cache(model.model._model_dir)
+
+
+@pytest.mark.parametrize(
+    "model_name",
+    ["BAAI/bge-small-en-v1.5"],
+)
+def test_session_sharing(model_name):
+    is_ci = os.getenv("CI")
+    model = TextEmbedding(model_name=model_name)
+    same_model = TextEmbedding(model_name=model_name)
+    other_threads_model = TextEmbedding(model_name=model_name, threads=1)
+    other_providers_model = TextEmbedding(
+        model_name=model_name, providers=[("CPUExecutionProvider", {})]
+    )
+
+    assert same_model.model.model is model.model.model
+    assert other_threads_model.model.model is not model.model.model
+    assert other_providers_model.model.model is not model.model.model
+
+    docs = ["hello world", "flag embedding"]
+    embeddings = np.stack(list(model.embed(docs)), axis=0)
+    embeddings_2 = np.stack(list(same_model.embed(docs)), axis=0)
+    assert np.allclose(embeddings, embeddings_2, atol=1e-3)
+
+    # any session option, not only the ones fastembed sets, separates the sessions
+    model_path = Path(model.model._model_dir) / model.model.model_description["model_file"]
+    session_options = ort.SessionOptions()
+    other_session_options = ort.SessionOptions()
+    other_session_options.use_deterministic_compute = True
+    providers = ["CPUExecutionProvider"]
+    assert _session_cache_key(model_path, providers, session_options) != _session_cache_key(
+        model_path, providers, other_session_options
+    )
+
+    if is_ci:
+        delete_model_cache(model.model._model_dir)
+
+
 @pytest.mark.parametrize(
     "model_name",
     ["BAAI/bge-small-en-v1.5"],